@@ -12,52 +12,52 @@ from {package_name}_{publisher_dotted_snake}_v0.imports.standard import (
 )
 from {package_name}_{publisher_dotted_snake}_v0.types import Err
 
+decode_json = json.JSONDecoder().decode
+encode_json = json.JSONEncoder(separators=(",", ":")).encode
+
+CHAT_PROCESS_ID = ProcessId("{package_name}", "{package_name}", "{publisher}")
+
 def parse_address(address_string):
-    node, _, rest = address_string.partition("@")
-    process, _, rest = rest.partition(":")
-    package, _, rest = rest.partition(":")
-    publisher, _, rest = rest.partition(":")
+    node, rest = address_string.split("@", 1)
+    process, package, publisher = rest.split(":", 2)
 
     return node, process, package, publisher
 
 class {package_name_upper_camel}{publisher_dotted_upper_camel}V0({package_name}_{publisher_dotted_snake}_v0.{package_name_upper_camel}{publisher_dotted_upper_camel}V0):
     def init(self, our):
         our_node, _, _, _ = parse_address(our)
-        result = receive()
-        if isinstance(result, Err):
-            raise Exception(f"{result}")
-        source, message = result
+        try:
+            source, message = receive()
+        except Err as e:
+            raise Exception(f"{e.value}")
 
         match message:
             case MessageResponse():
                 raise Exception(f"unexpected Response: {message}")
             case MessageRequest():
-                args = message.value.body.decode("utf-8")
-                target, message = args.split()
+                target_bytes, message_bytes = message.value.body.split(b" ", 1)
+                target = target_bytes.decode("utf-8")
+                message_text = message_bytes.decode("utf-8")
 
                 request = {
                     "Send": {
                         "target": target,
-                        "message": message,
+                        "message": message_text,
                     }
                 }
-                response = send_and_await_response(
-                    Address(
-                        our_node,
-                        ProcessId("{package_name}", "{package_name}", "{publisher}"),
-                    ),
-                    Request(False, 5, json.dumps(request).encode("utf-8"), None, []),
-                    None,
-                )
-                if isinstance(response, Err):
-                    raise Exception(f"{response}")
-                source, message = response
+                try:
+                    source, message = send_and_await_response(
+                        Address(our_node, CHAT_PROCESS_ID),
+                        Request(False, 5, encode_json(request).encode("utf-8"), None, []),
+                        None,
+                    )
+                except Err as e:
+                    raise Exception(f"{e.value}")
                 match message:
                     case MessageRequest():
                         raise Exception(f"unexpected Request: {message}")
                     case MessageResponse():
-                        message = message.value
-                        message, _ = message
-                        body = json.loads(message.body.decode("utf-8"))
+                        response, _ = message.value
+                        body = decode_json(response.body.decode("utf-8"))
                         if "Send" not in body:
                             raise Exception(f"unexpected Response: {body}")
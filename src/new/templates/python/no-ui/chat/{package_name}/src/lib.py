@@ -1,4 +1,6 @@
 import json
+from collections import defaultdict, deque
+from functools import partial
 
 import {package_name}_{publisher_dotted_snake}_v0
 from {package_name}_{publisher_dotted_snake}_v0.imports.standard import (
@@ -13,92 +15,181 @@ from {package_name}_{publisher_dotted_snake}_v0.imports.standard import (
     send_and_await_response,
     send_response,
 )
-from {package_name}_{publisher_dotted_snake}_v0.types import Err
+from {package_name}_{publisher_dotted_snake}_v0.types import Err, Ok
+
+decode_json = json.JSONDecoder().decode
+encode_json = json.JSONEncoder(separators=(",", ":")).encode
+
+MAX_BATCH_SIZE = 128
+MAX_CONVERSATION_LENGTH = 1024
+CHAT_PROCESS_ID = ProcessId("{package_name}", "{package_name}", "{publisher}")
+SEND_RESPONSE = b'{"Send":null}'
+HISTORY_RESPONSE_PREFIX = b'{"History":'
 
 def parse_address(address_string):
-    node, _, rest = address_string.partition("@")
-    process, _, rest = rest.partition(":")
-    package, _, rest = rest.partition(":")
-    publisher, _, rest = rest.partition(":")
+    node, rest = address_string.split("@", 1)
+    process, package, publisher = rest.split(":", 2)
 
     return node, process, package, publisher
 
 def add_to_archive(conversation, author, content, message_archive):
-    message = {
+    message_archive[conversation].append({
         "author": author,
         "content": content,
-    }
-    if conversation in message_archive:
-        message_archive[conversation].append(message)
+    })
+
+def is_send_request(send):
+    return (
+        isinstance(send, dict)
+        and isinstance(send.get("target"), str)
+        and isinstance(send.get("message"), str)
+    )
+
+def handle_send(our_node, source, message, send, message_archive):
+    if not is_send_request(send):
+        raise TypeError("Send must have a string target and message")
+    target, message_text = send["target"], send["message"]
+    if target == our_node:
+        print_to_terminal(0, f"{source.node}: {message_text}")
+        add_to_archive(
+            source.node,
+            source.node,
+            message_text,
+            message_archive,
+        )
     else:
-        message_archive[conversation] = [message]
-    return message_archive
+        send_and_await_response(
+            Address(target, CHAT_PROCESS_ID),
+            Request(False, 5, message.value.body, None, []),
+            None,
+        )
+        add_to_archive(
+            target,
+            our_node,
+            message_text,
+            message_archive,
+        )
+    send_response(
+        Response(False, SEND_RESPONSE, None, []),
+        None,
+    )
 
-def handle_message(our_node, message_archive):
-    result = receive()
-    if isinstance(result, Err):
-        raise Exception(f"got error: {result}")
-    source, message = result
-
-    match message:
-        case MessageResponse():
-            raise Exception(f"unexpected Response: {message}")
-        case MessageRequest():
-            body = json.loads(message.value.body.decode("utf-8"))
-            if "Send" in body:
-                target, message_text = body["Send"]["target"], body["Send"]["message"]
-                if target == our_node:
-                    print_to_terminal(0, f"{source.node}: {message_text}")
-                    message_archive = add_to_archive(
-                        source.node,
-                        source.node,
-                        message_text,
-                        message_archive,
-                    )
-                else:
-                    send_and_await_response(
-                        Address(
-                            target,
-                            ProcessId("{package_name}", "{package_name}", "{publisher}"),
-                        ),
-                        Request(False, 5, message.value.body, None, []),
-                        None,
-                    )
-                    message_archive = add_to_archive(
-                        target,
-                        our_node,
-                        message_text,
-                        message_archive,
-                    )
-                send_response(
-                    Response(False, json.dumps({"Send": None}).encode("utf-8"), None, []),
-                    None,
-                )
-            elif "History" in body:
-                node = body["History"]
-                send_response(
-                    Response(
+def handle_send_batch(our_node, source, message, sends, message_archive):
+    if not isinstance(sends, list) or not all(is_send_request(send) for send in sends):
+        raise TypeError("SendBatch entries must each have a string target and message")
+    outbound = {}
+    undelivered = []
+    for send in sends:
+        target, message_text = send["target"], send["message"]
+        if target == our_node:
+            print_to_terminal(0, f"{source.node}: {message_text}")
+            add_to_archive(
+                source.node,
+                source.node,
+                message_text,
+                message_archive,
+            )
+        else:
+            outbound.setdefault(target, []).append(message_text)
+    for target, target_sends in outbound.items():
+        address = Address(target, CHAT_PROCESS_ID)
+        for start in range(0, len(target_sends), MAX_BATCH_SIZE):
+            chunk = target_sends[start:start + MAX_BATCH_SIZE]
+            try:
+                send_and_await_response(
+                    address,
+                    Request(
                         False,
-                        json.dumps({"History": message_archive.get(node, [])}).encode("utf-8"),
+                        5,
+                        encode_json({"SendBatch": [
+                            {"target": target, "message": message_text}
+                            for message_text in chunk
+                        ]}).encode("utf-8"),
                         None,
                         [],
                     ),
                     None,
                 )
-            else:
-                raise Exception(f"Unexpected Request: {body}")
+            except Err as e:
+                print_to_terminal(0, f"{package_name}: failed to forward batch to {target}: {e.value}")
+                undelivered.extend(
+                    {"target": target, "message": message_text}
+                    for message_text in target_sends[start:]
+                )
+                break
+            for message_text in chunk:
+                add_to_archive(
+                    target,
+                    our_node,
+                    message_text,
+                    message_archive,
+                )
+    send_response(
+        Response(False, encode_json({"SendBatch": undelivered}).encode("utf-8"), None, []),
+        None,
+    )
+
+def handle_history(our_node, source, message, node, message_archive):
+    send_response(
+        Response(
+            False,
+            HISTORY_RESPONSE_PREFIX
+            + encode_json(list(message_archive.get(node, ()))).encode("utf-8")
+            + b"}",
+            None,
+            [],
+        ),
+        None,
+    )
+
+BODY_HANDLERS = {
+    "Send": handle_send,
+    "SendBatch": handle_send_batch,
+    "History": handle_history,
+}
 
-    return message_archive
+def handle_request(our_node, source, message, message_archive):
+    try:
+        body = decode_json(message.value.body.decode("utf-8"))
+    except ValueError as e:
+        return Err(f"malformed Request: {e}")
+    tag = next(iter(body), None) if isinstance(body, dict) else None
+    if tag not in BODY_HANDLERS:
+        return Err(f"Unexpected Request: {body}")
+    try:
+        BODY_HANDLERS[tag](our_node, source, message, body[tag], message_archive)
+    except Err as e:
+        return Err(f"failed to handle Request: {body}: {e.value}")
+    except (KeyError, TypeError) as e:
+        return Err(f"malformed Request: {body}: {e}")
+    return Ok(None)
+
+def handle_response(our_node, source, message, message_archive):
+    return Err(f"unexpected Response: {message}")
+
+MESSAGE_HANDLERS = {
+    MessageRequest: handle_request,
+    MessageResponse: handle_response,
+}
+
+def handle_message(our_node, message_archive):
+    try:
+        source, message = receive()
+    except Err as e:
+        return Err(f"got error: {e.value}")
+    return MESSAGE_HANDLERS[type(message)](our_node, source, message, message_archive)
 
 class {package_name_upper_camel}{publisher_dotted_upper_camel}V0({package_name}_{publisher_dotted_snake}_v0.{package_name_upper_camel}{publisher_dotted_upper_camel}V0):
     def init(self, our):
         print_to_terminal(0, "{package_name}: begin (python)")
 
         our_node, _, _, _ = parse_address(our)
-        message_archive = {}
+        message_archive = defaultdict(partial(deque, maxlen=MAX_CONVERSATION_LENGTH))
 
         while True:
             try:
-                message_archive = handle_message(our_node, message_archive)
+                result = handle_message(our_node, message_archive)
             except Exception as e:
-                print_to_terminal(0, f"{package_name}: error: {e}")
+                result = Err(f"unexpected error: {e}")
+            if result.__class__ is Err:
+                print_to_terminal(0, f"{package_name}: error: {result.value}")
@@ -10,37 +10,47 @@ from process.imports.standard import (
     Response,
     send_response,
 )
-from process.types import Err
+from process.types import Err, Ok
+
+decode_json = json.JSONDecoder().decode
+
+ACK_RESPONSE = b"Ack"
 
 def parse_address(address_string):
-    node, _, rest = address_string.partition("@")
-    process, _, rest = rest.partition(":")
-    package, _, rest = rest.partition(":")
-    publisher, _, rest = rest.partition(":")
+    node, rest = address_string.split("@", 1)
+    process, package, publisher = rest.split(":", 2)
 
     return node, process, package, publisher
 
+def handle_request(our_node, source, message):
+    try:
+        body = decode_json(message.value.body.decode("utf-8"))
+    except ValueError as e:
+        return Err(f"malformed Request: {e}")
+    print_to_terminal(0, f"{package_name}: got message {body}")
+    try:
+        send_response(
+            Response(False, ACK_RESPONSE, None, []),
+            None,
+        )
+    except Err as e:
+        return Err(f"failed to send Response: {e.value}")
+    return Ok(None)
+
+def handle_response(our_node, source, message):
+    return Err(f"unexpected Response: {message}")
+
+MESSAGE_HANDLERS = {
+    MessageRequest: handle_request,
+    MessageResponse: handle_response,
+}
+
 def handle_message(our_node):
-    result = receive()
-    if isinstance(result, Err):
-        raise Exception(f"{result}")
-    source, message = result
-
-    match message:
-        case MessageResponse():
-            raise Exception(f"unexpected Response: {message}")
-        case MessageRequest():
-            body = json.loads(message.value.body.decode("utf-8"))
-            print_to_terminal(0, f"{package_name}: got message {body}")
-            send_response(
-                Response(
-                    False,
-                    "Ack".encode("utf-8"),
-                    None,
-                    [],
-                ),
-                None,
-            )
+    try:
+        source, message = receive()
+    except Err as e:
+        return Err(f"{e.value}")
+    return MESSAGE_HANDLERS[type(message)](our_node, source, message)
 
 class Process(process.Process):
     def init(self, our):
@@ -50,6 +60,8 @@ class Process(process.Process):
 
         while True:
             try:
-                handle_message(our_node)
+                result = handle_message(our_node)
             except Exception as e:
-                print_to_terminal(0, f"{package_name}: error: {e}")
+                result = Err(f"unexpected error: {e}")
+            if result.__class__ is Err:
+                print_to_terminal(0, f"{package_name}: error: {result.value}")
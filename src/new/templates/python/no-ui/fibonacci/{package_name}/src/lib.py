@@ -1,5 +1,6 @@
 import json
 import time
+from array import array
 
 import process
 from process.imports.standard import (
@@ -10,75 +11,109 @@ from process.imports.standard import (
     receive,
     send_response,
 )
-from process.types import Err
+from process.types import Err, Ok
+
+decode_json = json.JSONDecoder().decode
+encode_json = json.JSONEncoder(separators=(",", ":")).encode
 
 def parse_address(address_string):
-    node, _, rest = address_string.partition("@")
-    process, _, rest = rest.partition(":")
-    package, _, rest = rest.partition(":")
-    publisher, _, rest = rest.partition(":")
+    node, rest = address_string.split("@", 1)
+    process, package, publisher = rest.split(":", 2)
 
     return node, process, package, publisher
 
-def fibonacci(n):
+def fibonacci_pair(n):
     if n == 0:
-        return 0
-    elif n == 1:
-        return 1
-    else:
-        return fibonacci(n-1) + fibonacci(n-2)
+        return 0, 1
+    a, b = fibonacci_pair(n >> 1)
+    c = a * ((b << 1) - a)
+    d = a * a + b * b
+    if n & 1:
+        return d, c + d
+    return c, d
+
+def fibonacci(n):
+    if n < 0:
+        raise ValueError(f"fibonacci is undefined for negative n: {n}")
+    return fibonacci_pair(n)[0]
+
+def handle_number(number):
+    start = time.perf_counter_ns()
+    result = fibonacci(number)
+    duration = time.perf_counter_ns() - start
+    print_to_terminal(
+        0,
+        f"{package_name}: fibonacci({number}) = {result}; {duration}ns",
+    )
+    send_response(
+        Response(False, encode_json({"Number": result}).encode("utf-8"), None, []),
+        None,
+    )
+
+def handle_numbers(numbers):
+    number, number_trials = numbers
+    starts = array("q", bytes(8 * number_trials))
+    ends = array("q", bytes(8 * number_trials))
+    perf_counter_ns = time.perf_counter_ns
+    result = fibonacci(number)
+    for i in range(number_trials):
+        starts[i] = perf_counter_ns()
+        fibonacci(number)
+        ends[i] = perf_counter_ns()
+    durations = [end - start for start, end in zip(starts, ends)]
+    mean = sum(durations) / number_trials
+    absolute_deviation = sum(abs(item - mean) for item in durations) / number_trials
+    print_to_terminal(
+        0,
+        f"{package_name}: fibonacci({number}) = {result}; {mean}±{absolute_deviation}ns averaged over {number_trials} trials",
+    )
+    send_response(
+        Response(
+            False,
+            encode_json({"Numbers": [result, number_trials]}).encode("utf-8"),
+            None,
+            [],
+        ),
+        None,
+    )
+
+BODY_HANDLERS = {
+    "Number": handle_number,
+    "Numbers": handle_numbers,
+}
+
+def handle_request(our_node, source, message):
+    if source.node != our_node:
+        return Err(f"dropping foreign Request from {source}")
+    try:
+        body = decode_json(message.value.body.decode("utf-8"))
+    except ValueError as e:
+        return Err(f"malformed Request: {e}")
+    tag = next(iter(body), None) if isinstance(body, dict) else None
+    if tag not in BODY_HANDLERS:
+        return Err(f"Unexpected Request: {body}")
+    try:
+        BODY_HANDLERS[tag](body[tag])
+    except Err as e:
+        return Err(f"failed to handle Request: {body}: {e.value}")
+    except (ArithmeticError, TypeError, ValueError) as e:
+        return Err(f"malformed Request: {body}: {e}")
+    return Ok(None)
+
+def handle_response(our_node, source, message):
+    return Err(f"unexpected Response: {message}")
+
+MESSAGE_HANDLERS = {
+    MessageRequest: handle_request,
+    MessageResponse: handle_response,
+}
 
 def handle_message(our_node):
-    result = receive()
-    if isinstance(result, Err):
-        raise Exception(f"{result}")
-    source, message = result
-
-    match message:
-        case MessageResponse():
-            raise Exception(f"unexpected Response: {message}")
-        case MessageRequest():
-            if source.node != our_node:
-                raise Exception(f"dropping foreign Request from {source}")
-            body = json.loads(message.value.body.decode("utf-8"))
-            if "Number" in body:
-                number = body["Number"]
-                start = time.perf_counter_ns()
-                result = fibonacci(number)
-                duration = time.perf_counter_ns() - start
-                print_to_terminal(
-                    0,
-                    f"{package_name}: fibonacci({number}) = {result}; {duration}ns",
-                )
-                send_response(
-                    Response(False, json.dumps({"Number": result}).encode("utf-8"), None, []),
-                    None,
-                )
-            elif "Numbers" in body:
-                number, number_trials = body["Numbers"]
-                durations = []
-                for _ in range(number_trials):
-                    start = time.perf_counter_ns()
-                    result = fibonacci(number)
-                    duration = time.perf_counter_ns() - start
-                    durations.append(duration)
-                mean = sum(durations) / number_trials
-                absolute_deviation = sum(abs(item - mean) for item in durations) / number_trials
-                print_to_terminal(
-                    0,
-                    f"{package_name}: fibonacci({number}) = {result}; {duration}±{absolute_deviation}ns averaged over {number_trials} trials",
-                )
-                send_response(
-                    Response(
-                        False,
-                        json.dumps({"Numbers": [result, number_trials]}).encode("utf-8"),
-                        None,
-                        [],
-                    ),
-                    None,
-                )
-            else:
-                raise Exception(f"Unexpected Request: {body}")
+    try:
+        source, message = receive()
+    except Err as e:
+        return Err(f"{e.value}")
+    return MESSAGE_HANDLERS[type(message)](our_node, source, message)
 
 class Process(process.Process):
     def init(self, our):
@@ -88,6 +123,8 @@ class Process(process.Process):
 
         while True:
             try:
-                handle_message(our_node)
+                result = handle_message(our_node)
             except Exception as e:
-                print_to_terminal(0, f"{package_name}: error: {e}")
+                result = Err(f"unexpected error: {e}")
+            if result.__class__ is Err:
+                print_to_terminal(0, f"{package_name}: error: {result.value}")